@@ -7,11 +7,17 @@ from datetime import datetime, timedelta
 import torch
 import joblib
 import os
+import sys
 import requests
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
 from typing import List, Dict
 
+# Make sibling modules (config, prefetch, main) importable however uvicorn is launched
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import Config
+from prefetch import PrefetchScheduler, read_cache
+
 # Assuming the model and other scripts are in the same directory or accessible
 # We will need to refactor the training script to make components reusable
 # For now, let's define the necessary components here or import them.
@@ -90,8 +96,27 @@ def fetch_news(ticker, start_date, end_date):
     news_data = [{'date': article['publishedAt'][:10], 'headline': article['title']} for article in articles]
     return pd.DataFrame(news_data)
 
+# ================== Price Data ==================
+def load_prices(ticker, start, end):
+    # Serve from the prefetched cache when it is fresh; only hit the network otherwise.
+    df = read_cache(ticker, start, end)
+    if df is not None:
+        return df
+    df = yf.download(ticker, start=start, end=end)
+    return df.reset_index()
+
 # ================== FastAPI App ==================
 app = FastAPI()
+prefetch_scheduler = PrefetchScheduler()
+
+@app.on_event("startup")
+def start_prefetch():
+    if Config.PREFETCH_ENABLED:
+        prefetch_scheduler.start()
+
+@app.on_event("shutdown")
+def stop_prefetch():
+    prefetch_scheduler.stop()
 
 app.add_middleware(
     CORSMiddleware,
@@ -105,23 +130,22 @@ app.add_middleware(
 def read_root():
     return {"message": "Stock Prediction API"}
 
+@app.get("/prefetch/status")
+def get_prefetch_status():
+    return prefetch_scheduler.status()
+
 @app.post("/predict")
 async def get_prediction(ticker: str = Form("RELIANCE.NS")):
     try:
         # 1. Load Model and Scaler
         # Note: This requires the training script to be refactored to share the model class
-        # For now, we assume `main.py` is in the parent directory.
-        import sys
-        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-        
         model, scaler = load_model_and_scaler(ticker)
         
         # 2. Fetch latest data
         end_date = datetime.now()
         start_date = end_date - timedelta(days=365) # Fetch one year of data to have enough for features
         
-        df = yf.download(ticker, start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'))
-        df.reset_index(inplace=True)
+        df = load_prices(ticker, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
         
         # 3. Feature Engineering
         news_df = fetch_news(ticker, start_date, end_date)
@@ -185,11 +209,7 @@ def get_historical(
     end: str = Query(..., description="End date YYYY-MM-DD"),
     chartType: str = Query("area", description="Chart type: area or candlestick")
 ) -> List[Dict]:
-    import yfinance as yf
-    import pandas as pd
-
-    df = yf.download(ticker, start=start, end=end)
-    df = df.reset_index()
+    df = load_prices(ticker, start, end)
     if chartType == "candlestick":
         data = [
             {
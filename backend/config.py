@@ -0,0 +1,45 @@
+# ================== Import Libraries ==================
+import os
+from datetime import datetime
+
+# ================== Config ==================
+class Config:
+    TICKER = "^NSEBANK"  # Default ticker
+    START_DATE = "2015-01-01"
+    END_DATE = datetime.now().strftime('%Y-%m-%d')
+    TRAIN_RATIO = 0.7
+    VAL_RATIO = 0.15
+    TEST_RATIO = 0.15
+    SEQUENCE_LENGTH = 100
+    FUTURE_STEPS = 1
+    BATCH_SIZE = 32
+    EPOCHS = 150
+    LEARNING_RATE = 0.001
+    PATIENCE = 10
+    MODEL_BASE_PATH = "backend/models"
+    CACHE_DIR = "backend/data_cache"
+    NEWS_API_URL = "https://newsapi.org/v2/everything"
+    NEWS_API_KEY = "a2a4046a48d74545a3cfa5717ac6185a"  # Replace with your News API key
+    CHUNK_SIZE = 10000
+
+    # Background prefetch (see prefetch.py)
+    PREFETCH_ENABLED = os.environ.get("PREFETCH_ENABLED", "1") == "1"
+    PREFETCH_DATA_DIR = os.environ.get("PREFETCH_DATA_DIR")  # Read prices from local files instead of yfinance (offline)
+    PREFETCH_UNIVERSE = [t for t in os.environ.get("PREFETCH_UNIVERSE", "^NSEBANK,RELIANCE.NS,TCS.NS,HDFCBANK.NS,INFY.NS,ICICIBANK.NS,HINDUNILVR.NS,SBIN.NS,BHARTIARTL.NS,KOTAKBANK.NS,BAJFINANCE.NS").split(",") if t]
+    PREFETCH_BATCH_SIZE = 20
+    PREFETCH_MAX_WORKERS = 2
+    PREFETCH_MAX_RETRIES = 3
+    PREFETCH_BACKOFF_SECONDS = 5
+    PREFETCH_MIN_INTERVAL_SECONDS = 2
+    PREFETCH_CLOSE_DELAY_MINUTES = 30
+
+    def __init__(self, ticker=None):
+        if ticker:
+            self.TICKER = ticker
+        
+        os.makedirs(self.MODEL_BASE_PATH, exist_ok=True)
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        
+        self.MODEL_PATH = f"{self.MODEL_BASE_PATH}/{self.TICKER.replace('^', '')}_model.pth"
+        self.SCALER_PATH = f"{self.MODEL_BASE_PATH}/{self.TICKER.replace('^', '')}_scaler.pkl"
+        self.CACHE_PATH = f"{self.CACHE_DIR}/{self.TICKER.replace('^', '')}.parquet"
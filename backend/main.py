@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 import yfinance as yf
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 from sklearn.preprocessing import RobustScaler
 from torch.utils.data import DataLoader, TensorDataset
@@ -20,36 +21,8 @@ import requests
 from nltk.sentiment import SentimentIntensityAnalyzer
 import nltk
 
-# ================== Config ==================
-class Config:
-    TICKER = "^NSEBANK"  # Default ticker
-    START_DATE = "2015-01-01"
-    END_DATE = datetime.now().strftime('%Y-%m-%d')
-    TRAIN_RATIO = 0.7
-    VAL_RATIO = 0.15
-    TEST_RATIO = 0.15
-    SEQUENCE_LENGTH = 100
-    FUTURE_STEPS = 1
-    BATCH_SIZE = 32
-    EPOCHS = 150
-    LEARNING_RATE = 0.001
-    PATIENCE = 10
-    MODEL_BASE_PATH = "backend/models"
-    CACHE_DIR = "backend/data_cache"
-    NEWS_API_URL = "https://newsapi.org/v2/everything"
-    NEWS_API_KEY = "a2a4046a48d74545a3cfa5717ac6185a"  # Replace with your News API key
-    CHUNK_SIZE = 10000
-
-    def __init__(self, ticker=None):
-        if ticker:
-            self.TICKER = ticker
-        
-        os.makedirs(self.MODEL_BASE_PATH, exist_ok=True)
-        os.makedirs(self.CACHE_DIR, exist_ok=True)
-        
-        self.MODEL_PATH = f"{self.MODEL_BASE_PATH}/{self.TICKER.replace('^', '')}_model.pth"
-        self.SCALER_PATH = f"{self.MODEL_BASE_PATH}/{self.TICKER.replace('^', '')}_scaler.pkl"
-        self.CACHE_PATH = f"{self.CACHE_DIR}/{self.TICKER.replace('^', '')}.parquet"
+from config import Config
+from prefetch import write_cache
 
 # ================== Data Loading ==================
 def load_data(config, use_cache=True):
@@ -69,7 +42,7 @@ def load_data(config, use_cache=True):
         df = df.drop(['Adj Close'], axis=1, errors='ignore')
         
         if not df.empty:
-            df.to_parquet(config.CACHE_PATH, compression='snappy')
+            write_cache(config.TICKER, df)
             print(f"Data cached to {config.CACHE_PATH}")
         
         return df
@@ -223,9 +196,33 @@ class MultiHeadAttention(nn.Module):
         
         return out
 
+    def forward_last(self, x):
+        # Only the final query row is needed downstream, so attend from the last
+        # timestep over the full sequence: O(L) instead of O(L^2).
+        batch_size, seq_len, hidden_dim = x.size()
+        
+        q = self.query(x[:, -1:, :]).view(batch_size, 1, self.num_heads, self.head_dim).transpose(1, 2)
+        k = self.key(x).view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        v = self.value(x).view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        
+        # Default scale is 1/sqrt(head_dim), same as forward()
+        out = F.scaled_dot_product_attention(q, k, v)
+        out = out.transpose(1, 2).contiguous().view(batch_size, hidden_dim)
+        out = self.fc(out)
+        
+        return out
+
 class EnhancedLSTMWithAttention(nn.Module):
-    def __init__(self, input_size, hidden_sizes, output_size, dropout=0.2):
+    # attention_mode: 'last' attends from the final timestep only (fast path),
+    # 'full' runs attention over every position. Both share the same weights,
+    # so checkpoints load into either mode and give matching predictions.
+    ATTENTION_MODES = ('last', 'full')
+
+    def __init__(self, input_size, hidden_sizes, output_size, dropout=0.2, attention_mode='last'):
         super(EnhancedLSTMWithAttention, self).__init__()
+        if attention_mode not in self.ATTENTION_MODES:
+            raise ValueError(f"attention_mode must be one of {self.ATTENTION_MODES}, got {attention_mode!r}")
+        self.attention_mode = attention_mode
         
         self.lstm1 = nn.LSTM(input_size, hidden_sizes[0], batch_first=True, bidirectional=True)
         self.dropout1 = nn.Dropout(dropout)
@@ -246,9 +243,13 @@ class EnhancedLSTMWithAttention(nn.Module):
         out = self.dropout1(out)
         out, _ = self.lstm2(out)
         out = self.dropout2(out)
-        att_out = self.attention(out)
-        out = self.layer_norm(out + att_out)
-        out = out[:, -1, :]
+        if self.attention_mode == 'last':
+            att_out = self.attention.forward_last(out)
+            out = self.layer_norm(out[:, -1, :] + att_out)
+        else:
+            att_out = self.attention(out)
+            out = self.layer_norm(out + att_out)
+            out = out[:, -1, :]
         out = self.fc1(out)
         out = self.dropout3(out)
         out = self.relu(out)
@@ -0,0 +1,337 @@
+# ================== Import Libraries ==================
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from config import Config
+
+# Background prefetch of the ticker universe into the local price cache.
+# After each exchange close the universe is downloaded in multi-ticker batches,
+# so load_data and the API request paths can read from the cache instead of
+# calling yf.download per ticker on demand.
+
+# ================== Exchange Calendar ==================
+# (timezone, close hour, close minute). Weekends are skipped; holidays are
+# handled by the prefetch marker in is_fresh rather than a calendar.
+EXCHANGES = {
+    'NSE': ('Asia/Kolkata', 15, 30),
+    'US': ('America/New_York', 16, 0),
+}
+
+def exchange_for(ticker):
+    if ticker.endswith(('.NS', '.BO')) or ticker.startswith(('^NSE', '^BSE', '^CNX')):
+        return 'NSE'
+    return 'US'
+
+def last_close(exchange, now=None):
+    """Most recent weekday close (plus settle delay) at or before `now`, in UTC."""
+    tz_name, hour, minute = EXCHANGES[exchange]
+    tz = ZoneInfo(tz_name)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    close = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    close += timedelta(minutes=Config.PREFETCH_CLOSE_DELAY_MINUTES)
+    while close > now or close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close.astimezone(ZoneInfo('UTC'))
+
+def last_session_date(exchange, now=None):
+    """Trading date of the most recent settled session, in the exchange's timezone."""
+    tz = ZoneInfo(EXCHANGES[exchange][0])
+    return last_close(exchange, now).astimezone(tz).date()
+
+def next_close(exchange, now=None):
+    """Next weekday close (plus settle delay) strictly after `now`, in UTC."""
+    tz_name, hour, minute = EXCHANGES[exchange]
+    tz = ZoneInfo(tz_name)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    close = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    close += timedelta(minutes=Config.PREFETCH_CLOSE_DELAY_MINUTES)
+    while close <= now or close.weekday() >= 5:
+        close += timedelta(days=1)
+    return close.astimezone(ZoneInfo('UTC'))
+
+# ================== Fetchers ==================
+class YFinanceFetcher:
+    """Downloads several tickers in one yf.download call."""
+
+    def fetch(self, tickers, start, end):
+        import yfinance as yf
+        df = yf.download(tickers, start=start, end=end, group_by='ticker', threads=False, progress=False)
+        results = {}
+        for ticker in tickers:
+            if isinstance(df.columns, pd.MultiIndex):
+                if ticker not in df.columns.get_level_values(0):
+                    continue
+                ticker_df = df[ticker]
+            else:
+                ticker_df = df
+            ticker_df = ticker_df.dropna(how='all')
+            if not ticker_df.empty:
+                results[ticker] = ticker_df.reset_index()
+        return results
+
+class LocalFileFetcher:
+    """Offline stand-in that reads <TICKER>.parquet or <TICKER>.csv from a directory."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+
+    def fetch(self, tickers, start, end):
+        results = {}
+        for ticker in tickers:
+            name = ticker.replace('^', '')
+            parquet_path = os.path.join(self.data_dir, f"{name}.parquet")
+            csv_path = os.path.join(self.data_dir, f"{name}.csv")
+            if os.path.exists(parquet_path):
+                df = pd.read_parquet(parquet_path)
+            elif os.path.exists(csv_path):
+                df = pd.read_csv(csv_path)
+            else:
+                continue
+            df['Date'] = pd.to_datetime(df['Date'])
+            df = df[(df['Date'] >= pd.Timestamp(start)) & (df['Date'] < pd.Timestamp(end))]
+            if not df.empty:
+                results[ticker] = df.reset_index(drop=True)
+        return results
+
+# ================== Rate Limiting ==================
+class RateLimiter:
+    """Enforces a minimum interval between provider calls across worker threads."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_call = 0.0
+
+    def wait(self, stop_event):
+        """Block until the next call is allowed. Returns True if `stop_event` was set meanwhile."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.min_interval
+        return stop_event.wait(max(delay, 0))
+
+# ================== Cache ==================
+def cache_path(ticker):
+    return Config(ticker).CACHE_PATH
+
+def marker_path(ticker):
+    return f"{os.path.splitext(cache_path(ticker))[0]}.prefetch.json"
+
+def _atomic_write(path, write):
+    # Unique temp name so concurrent writers (several uvicorn workers, or a
+    # training run) never share a partial file; os.replace swaps atomically.
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def write_cache(ticker, df):
+    df = df.drop(['Adj Close'], axis=1, errors='ignore')
+    _atomic_write(cache_path(ticker), lambda path: df.to_parquet(path, compression='snappy'))
+
+def write_marker(ticker, fetched_at, through):
+    """Record a successful prefetch; load_data never touches this file."""
+    marker = {'fetched_at': fetched_at.isoformat(), 'cached_through': through.isoformat()}
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(marker, f)
+    _atomic_write(marker_path(ticker), write)
+
+def read_marker(ticker):
+    try:
+        with open(marker_path(ticker)) as f:
+            marker = json.load(f)
+        return datetime.fromisoformat(marker['fetched_at']), date.fromisoformat(marker['cached_through'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+def cached_through(ticker):
+    """Date of the latest bar in the cache, or None if there is no usable cache."""
+    path = cache_path(ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        dates = pd.to_datetime(pd.read_parquet(path, columns=['Date'])['Date'])
+    except Exception:
+        return None
+    if dates.empty:
+        return None
+    return dates.max().date()
+
+def is_fresh(ticker, now=None):
+    # Judge by content, not mtime: load_data rewrites the same file with an
+    # exclusive end date, so a new file can still be missing the last session.
+    exchange = exchange_for(ticker)
+    latest = cached_through(ticker)
+    if latest is None:
+        return False
+    if latest >= last_session_date(exchange, now):
+        return True
+    # Exchange holiday (or provider has nothing newer): a prefetch finished
+    # after the last close and the file still holds everything it wrote.
+    marker = read_marker(ticker)
+    if marker is None:
+        return False
+    fetched_at, through = marker
+    return fetched_at >= last_close(exchange, now) and latest >= through
+
+def settled_bars(ticker, df, now=None):
+    """Drop bars after the last settled session, e.g. today's partial bar fetched mid-session."""
+    session = last_session_date(exchange_for(ticker), now)
+    return df[pd.to_datetime(df['Date']).dt.date <= session]
+
+def read_cache(ticker, start=None, end=None, now=None):
+    """Cached prices for `ticker` if fresh and covering `start`, else None."""
+    if not is_fresh(ticker, now):
+        return None
+    if start is not None and pd.Timestamp(start) < pd.Timestamp(Config.START_DATE):
+        return None
+    df = pd.read_parquet(cache_path(ticker))
+    df['Date'] = pd.to_datetime(df['Date'])
+    if start is not None:
+        df = df[df['Date'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['Date'] < pd.Timestamp(end)]
+    return df.reset_index(drop=True)
+
+# ================== Scheduler ==================
+class PrefetchScheduler:
+    def __init__(self, tickers=None, fetcher=None, batch_size=None, max_workers=None,
+                 max_retries=None, backoff=None, min_interval=None):
+        self.tickers = list(tickers or Config.PREFETCH_UNIVERSE)
+        if fetcher is None:
+            fetcher = LocalFileFetcher(Config.PREFETCH_DATA_DIR) if Config.PREFETCH_DATA_DIR else YFinanceFetcher()
+        self.fetcher = fetcher
+        self.batch_size = batch_size or Config.PREFETCH_BATCH_SIZE
+        self.max_workers = max_workers or Config.PREFETCH_MAX_WORKERS
+        self.max_retries = Config.PREFETCH_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = Config.PREFETCH_BACKOFF_SECONDS if backoff is None else backoff
+        self.rate_limiter = RateLimiter(Config.PREFETCH_MIN_INTERVAL_SECONDS if min_interval is None else min_interval)
+
+        self._lock = threading.Lock()
+        self._errors = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fetch_batch(self, batch, now=None):
+        start = Config.START_DATE
+        # yfinance treats `end` as exclusive, so ask through tomorrow and let
+        # settled_bars drop anything from a session that has not closed yet
+        end = ((now or datetime.now(ZoneInfo('UTC'))) + timedelta(days=1)).strftime('%Y-%m-%d')
+        pending = list(batch)
+        last_error = "No data returned"
+
+        for attempt in range(self.max_retries + 1):
+            # Event.wait instead of sleep, so stop() is not held up by backoff
+            if attempt and self._stop.wait(self.backoff * 2 ** (attempt - 1)):
+                return
+            if self.rate_limiter.wait(self._stop):
+                return
+            try:
+                results = self.fetcher.fetch(pending, start, end)
+            except Exception as e:
+                last_error = str(e)
+                print(f"Prefetch batch {pending} failed (attempt {attempt + 1}): {e}")
+                continue
+
+            done = set()
+            for ticker, df in results.items():
+                # Per ticker: a batch can mix exchanges with different closes
+                df = settled_bars(ticker, df, now)
+                if df.empty:
+                    continue
+                done.add(ticker)
+                try:
+                    write_cache(ticker, df)
+                    write_marker(ticker, now or datetime.now(ZoneInfo('UTC')), pd.to_datetime(df['Date']).max().date())
+                except Exception as e:
+                    with self._lock:
+                        self._errors[ticker] = str(e)
+                    continue
+                with self._lock:
+                    self._errors.pop(ticker, None)
+            pending = [t for t in pending if t not in done]
+            if not pending:
+                return
+
+        with self._lock:
+            for ticker in pending:
+                self._errors[ticker] = last_error
+        print(f"Prefetch gave up on {pending}: {last_error}")
+
+    def run_once(self, tickers=None, now=None):
+        """Prefetch `tickers` (default: the whole universe) and block until done."""
+        tickers = list(tickers or self.tickers)
+        print(f"Prefetching {len(tickers)} tickers...")
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(lambda batch: self._fetch_batch(batch, now), batches))
+        return self.status(now)
+
+    def status(self, now=None):
+        """Freshness per ticker in the universe."""
+        with self._lock:
+            errors = dict(self._errors)
+        status = {}
+        for ticker in self.tickers:
+            path = cache_path(ticker)
+            cached_at = None
+            if os.path.exists(path):
+                cached_at = datetime.fromtimestamp(os.path.getmtime(path), ZoneInfo('UTC')).isoformat()
+            marker = read_marker(ticker)
+            latest = cached_through(ticker)
+            status[ticker] = {
+                'exchange': exchange_for(ticker),
+                'fresh': is_fresh(ticker, now),
+                'cached_at': cached_at,
+                'cached_through': latest.isoformat() if latest else None,
+                'last_close': last_close(exchange_for(ticker), now).isoformat(),
+                'last_prefetch': marker[0].isoformat() if marker else None,
+                'error': errors.get(ticker),
+            }
+        return status
+
+    def _next_run(self, now):
+        exchanges = {exchange_for(t) for t in self.tickers}
+        next_run = min(next_close(ex, now) for ex in exchanges)
+        if any(not is_fresh(t, now) for t in self.tickers):
+            # A throttled or failed run should not leave tickers stale until
+            # the next close; rate limits usually clear within minutes.
+            retry_interval = timedelta(seconds=self.backoff * 2 ** self.max_retries)
+            next_run = min(next_run, now + retry_interval)
+        return next_run
+
+    def _run(self):
+        while not self._stop.is_set():
+            stale = [t for t in self.tickers if not is_fresh(t)]
+            if stale:
+                self.run_once(stale)
+            now = datetime.now(ZoneInfo('UTC'))
+            if self._stop.wait((self._next_run(now) - now).total_seconds()):
+                break
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='prefetch-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        # An in-flight download cannot be interrupted; the thread is a daemon,
+        # so give up waiting after `timeout` rather than blocking shutdown.
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,32 @@
+import pytest
+import torch
+
+from main import EnhancedLSTMWithAttention
+
+def build_model(attention_mode):
+    return EnhancedLSTMWithAttention(input_size=29, hidden_sizes=[16, 32], output_size=4, dropout=0.3,
+                                     attention_mode=attention_mode)
+
+@pytest.mark.parametrize('seq_len', [1, 5, 100])
+@pytest.mark.parametrize('training', [False, True])
+def test_last_mode_matches_full_mode_checkpoint(seq_len, training):
+    torch.manual_seed(0)
+    full = build_model('full')
+    last = build_model('last')
+    last.load_state_dict(full.state_dict())
+    full.train(training)
+    last.train(training)
+    x = torch.randn(3, seq_len, 29)
+
+    # Same seed before each pass so dropout draws the same masks
+    torch.manual_seed(1)
+    out_full = full(x)
+    torch.manual_seed(1)
+    out_last = last(x)
+
+    assert out_last.shape == (3, 4)
+    assert torch.allclose(out_full, out_last, atol=1e-6)
+
+def test_invalid_attention_mode_raises():
+    with pytest.raises(ValueError):
+        build_model('sparse')
@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import pytest
+
+from config import Config
+from prefetch import (LocalFileFetcher, PrefetchScheduler, is_fresh, last_close, last_session_date,
+                      next_close, read_cache, write_cache)
+
+UTC = ZoneInfo('UTC')
+MONDAY_SESSION = datetime(2026, 10, 19, 15, 0, tzinfo=UTC)      # 11:00 New York, market open
+MONDAY_AFTER_CLOSE = datetime(2026, 10, 19, 21, 0, tzinfo=UTC)  # 17:00 New York, close + delay passed
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(Config, 'MODEL_BASE_PATH', str(tmp_path / 'models'))
+    monkeypatch.setattr(Config, 'PREFETCH_CLOSE_DELAY_MINUTES', 30)
+    monkeypatch.setattr(Config, 'PREFETCH_DATA_DIR', None)
+
+def make_prices(end, periods=30):
+    dates = pd.bdate_range(end=end, periods=periods)
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': 100.0, 'High': 101.0, 'Low': 99.0, 'Close': 100.5, 'Volume': 1000,
+    })
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'prices'
+    path.mkdir()
+    # Provider data includes Monday's bar, which is partial until the close
+    for ticker in ['AAA', 'BBB']:
+        make_prices('2026-10-19').to_csv(path / f"{ticker}.csv", index=False)
+    return path
+
+class FlakyFetcher(LocalFileFetcher):
+    """Drops BBB from the first response to exercise the retry path."""
+
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.calls = []
+
+    def fetch(self, tickers, start, end):
+        self.calls.append(list(tickers))
+        results = super().fetch(tickers, start, end)
+        if len(self.calls) == 1:
+            results.pop('BBB', None)
+        return results
+
+# ================== Calendar ==================
+def test_close_skips_weekend():
+    saturday = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+    assert last_close('US', saturday) == datetime(2026, 10, 16, 20, 30, tzinfo=UTC)
+    assert next_close('US', saturday) == datetime(2026, 10, 19, 20, 30, tzinfo=UTC)
+    assert last_close('NSE', saturday) == datetime(2026, 10, 16, 10, 30, tzinfo=UTC)
+    assert last_session_date('NSE', saturday) == date(2026, 10, 16)
+
+def test_close_waits_for_settle_delay():
+    monday_just_after_close = datetime(2026, 10, 19, 20, 15, tzinfo=UTC)  # 16:15 New York
+    assert last_close('US', monday_just_after_close) == datetime(2026, 10, 16, 20, 30, tzinfo=UTC)
+    assert next_close('US', monday_just_after_close) == datetime(2026, 10, 19, 20, 30, tzinfo=UTC)
+
+# ================== Cache ==================
+def test_recent_file_missing_last_session_is_stale():
+    old_end = pd.Timestamp.now().normalize() - pd.Timedelta(days=14)
+    write_cache('AAA', make_prices(old_end))
+    assert not is_fresh('AAA')
+    assert read_cache('AAA') is None
+
+# ================== Scheduler ==================
+def test_run_once_batches_and_retries_missing_tickers(data_dir):
+    fetcher = FlakyFetcher(str(data_dir))
+    scheduler = PrefetchScheduler(tickers=['AAA', 'BBB', 'CCC'], fetcher=fetcher, batch_size=2,
+                                  max_workers=1, max_retries=2, backoff=0, min_interval=0)
+
+    status = scheduler.run_once(now=MONDAY_AFTER_CLOSE)
+
+    assert fetcher.calls == [['AAA', 'BBB'], ['BBB'], ['CCC'], ['CCC'], ['CCC']]
+    for ticker in ['AAA', 'BBB']:
+        assert status[ticker]['fresh']
+        assert status[ticker]['error'] is None
+        assert status[ticker]['exchange'] == 'US'
+        assert status[ticker]['cached_at'] is not None
+        assert status[ticker]['cached_through'] == '2026-10-19'
+        assert status[ticker]['last_prefetch'] is not None
+    assert not status['CCC']['fresh']
+    assert status['CCC']['error'] == "No data returned"
+    assert status['CCC']['cached_at'] is None
+
+    cached = read_cache('AAA', now=MONDAY_AFTER_CLOSE)
+    assert len(cached) == 30
+    assert 'Close' in cached.columns
+
+def test_holiday_close_counts_as_fresh_once_prefetched(tmp_path):
+    # Monday is treated as a holiday: the provider has nothing after Friday
+    path = tmp_path / 'holiday'
+    path.mkdir()
+    make_prices('2026-10-16').to_csv(path / 'AAA.csv', index=False)
+    scheduler = PrefetchScheduler(tickers=['AAA'], fetcher=LocalFileFetcher(str(path)),
+                                  max_retries=0, backoff=0, min_interval=0)
+
+    assert not is_fresh('AAA', MONDAY_AFTER_CLOSE)
+    status = scheduler.run_once(now=MONDAY_AFTER_CLOSE)
+    assert status['AAA']['fresh']
+    assert status['AAA']['error'] is None
+    assert status['AAA']['cached_through'] == '2026-10-16'
+    assert read_cache('AAA', now=MONDAY_AFTER_CLOSE) is not None
+
+    # An older file written over the prefetch (e.g. by load_data) is stale again
+    write_cache('AAA', make_prices('2026-10-15'))
+    assert not is_fresh('AAA', MONDAY_AFTER_CLOSE)
+
+def test_mid_session_fetch_skips_partial_bar_and_refetches_after_close(data_dir):
+    scheduler = PrefetchScheduler(tickers=['AAA'], fetcher=LocalFileFetcher(str(data_dir)),
+                                  max_retries=0, backoff=0, min_interval=0)
+
+    status = scheduler.run_once(now=MONDAY_SESSION)
+    assert status['AAA']['cached_through'] == '2026-10-16'
+    assert status['AAA']['fresh']
+
+    assert not is_fresh('AAA', MONDAY_AFTER_CLOSE)
+    status = scheduler.run_once(now=MONDAY_AFTER_CLOSE)
+    assert status['AAA']['cached_through'] == '2026-10-19'
+    assert status['AAA']['fresh']
+
+def test_failed_tickers_are_retried_before_next_close(data_dir):
+    scheduler = PrefetchScheduler(tickers=['AAA', 'CCC'], fetcher=LocalFileFetcher(str(data_dir)),
+                                  max_retries=3, backoff=5, min_interval=0)
+    scheduler.run_once(['AAA'], now=MONDAY_AFTER_CLOSE)
+
+    # CCC is still stale, so check again after backoff * 2**max_retries, not at Tuesday's close
+    assert scheduler._next_run(MONDAY_AFTER_CLOSE) == MONDAY_AFTER_CLOSE + timedelta(seconds=40)
+
+    scheduler.tickers = ['AAA']
+    assert scheduler._next_run(MONDAY_AFTER_CLOSE) == datetime(2026, 10, 20, 20, 30, tzinfo=UTC)
+
+def test_data_dir_selects_local_fetcher(data_dir, monkeypatch):
+    monkeypatch.setattr(Config, 'PREFETCH_DATA_DIR', str(data_dir))
+    scheduler = PrefetchScheduler(tickers=['AAA'])
+    assert isinstance(scheduler.fetcher, LocalFileFetcher)